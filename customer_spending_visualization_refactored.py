@@ -3,14 +3,16 @@ Executive-Ready Customer Spending Analysis Dashboard
 Modern, minimalist design with clear visual hierarchy
 """
 
+import argparse
 import sqlite3
-import pandas as pd
+import zlib
 import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+from matplotlib import patheffects
 from matplotlib.patches import Rectangle, FancyBboxPatch
+from db_connection import fetch_typed_frame, get_conn
+from figure_utils import tight_bbox
 import warnings
-warnings.filterwarnings('ignore')
 
 # Modern color palette - harmonious and distinct
 COLORS = {
@@ -29,17 +31,46 @@ COLORS = {
     'other': '#74B9FF'           # Blue
 }
 
-# Set modern style
-sns.set_style("whitegrid")
-sns.set_palette("husl")
+# Price tier label -> chart color
+TIER_COLOR = {'Premium': COLORS['premium'], 'Luxury': COLORS['luxury'], 'Standard': COLORS['standard']}
+
+# Bar value label formatter, e.g. "$35,608"
+format_dollars = '${:,.0f}'.format
+
+# Price tier label -> revenue column in the pivoted category frame
+TIER_REVENUE_COLUMNS = {'Standard': 'standard_rev', 'Luxury': 'luxury_rev', 'Premium': 'premium_rev'}
+
+# Screen-quality PNG by default: 150 dpi is a quarter of the pixels of a 300 dpi
+# print render at this figure size. The PDF stays vector either way
+DEFAULT_PNG_DPI = 150
+
+# Set modern style (matplotlib's bundled copy of seaborn's whitegrid); every
+# chart passes explicit colors, so no default palette is needed
+plt.style.use('seaborn-v0_8-whitegrid')
+# Tick and spine settings where the bundled style differs from seaborn's
+# own whitegrid; tick sizes still feed label padding with ticks hidden
+plt.rcParams['axes.linewidth'] = 0.8
+plt.rcParams['xtick.bottom'] = False
+plt.rcParams['ytick.left'] = False
+plt.rcParams['xtick.major.size'] = 3.5
+plt.rcParams['ytick.major.size'] = 3.5
+# Shared chart-axes look: dashed light value-axis grid, no top/right spines
+# and light remaining spines (the legend keeps the style's frame color)
+plt.rcParams['axes.grid.axis'] = 'y'
+plt.rcParams['grid.alpha'] = 0.2
+plt.rcParams['grid.linestyle'] = '--'
+plt.rcParams['grid.linewidth'] = 0.8
+plt.rcParams['axes.spines.top'] = False
+plt.rcParams['axes.spines.right'] = False
+plt.rcParams['legend.edgecolor'] = plt.rcParams['axes.edgecolor']
+plt.rcParams['axes.edgecolor'] = COLORS['border']
 plt.rcParams['font.family'] = 'sans-serif'
 plt.rcParams['font.sans-serif'] = ['Arial', 'DejaVu Sans', 'Liberation Sans']
 
-def load_data(db_path="ecommerce.db"):
-    """Load customer spending data by product categories."""
-    conn = sqlite3.connect(db_path)
-    
-    query = """
+# Per-category, per-tier aggregate over the full order history. The result
+# is materialized into ROLLUP_TABLE so repeat runs read a handful of rows
+# instead of re-joining Orders, Order_Items and Products
+CATEGORY_TIER_QUERY = """
     WITH CategorySpending AS (
         SELECT 
             p.category,
@@ -67,26 +98,152 @@ def load_data(db_path="ecommerce.db"):
         AVG(price) AS avg_price
     FROM CategorySpending
     GROUP BY category, price_tier
+    """
+
+# Pivots the category/tier rows from {source} into one row per category,
+# with a revenue column per tier for the stacked bars
+CATEGORY_PIVOT_QUERY = """
+    SELECT 
+        category,
+        SUM(CASE WHEN price_tier = 'Premium' THEN total_revenue ELSE 0 END) AS premium_rev,
+        SUM(CASE WHEN price_tier = 'Luxury' THEN total_revenue ELSE 0 END) AS luxury_rev,
+        SUM(CASE WHEN price_tier = 'Standard' THEN total_revenue ELSE 0 END) AS standard_rev,
+        SUM(total_revenue) AS total_revenue,
+        SUM(total_orders) AS total_orders,
+        SUM(unique_customers) AS unique_customers,
+        SUM(total_items_sold) AS total_items_sold
+    FROM {source}
+    GROUP BY category
     ORDER BY total_revenue DESC
     """
+
+CATEGORY_PIVOT_DTYPES = {
+    'category': 'category',
+    'premium_rev': np.float64,
+    'luxury_rev': np.float64,
+    'standard_rev': np.float64,
+    'total_revenue': np.float64,
+    'total_orders': np.int64,
+    'unique_customers': np.int64,
+    'total_items_sold': np.int64
+}
+
+ROLLUP_TABLE = "category_tier_rollup"
+ROLLUP_META_TABLE = "rollup_meta"
+
+# Covers every Order_Items column the roll-up query reads, so its scan of
+# Order_Items stays inside the index. Orders and Products are reached
+# through their integer primary keys and need no extra index
+ROLLUP_SOURCE_INDEXES = {
+    'idx_Order_Items_rollup': 'CREATE INDEX IF NOT EXISTS idx_Order_Items_rollup '
+                              'ON Order_Items("order_id", "product_id", "quantity", "subtotal")',
+}
+
+# Row counts and highest rowids of the source tables. Each term is an index
+# lookup or a scan of the smallest index, far cheaper than the join itself.
+# These catch rows added or removed outside the ingester; a reload through
+# ingest_csv_to_sqlite.py drops ROLLUP_META_TABLE, which also covers edits
+# that change only values
+SOURCE_SIGNATURE_QUERY = """
+    SELECT (SELECT COUNT(*) FROM Orders) || ':' || (SELECT MAX(rowid) FROM Orders)
+        || ':' || (SELECT COUNT(*) FROM Order_Items) || ':' || (SELECT MAX(rowid) FROM Order_Items)
+        || ':' || (SELECT COUNT(*) FROM Products) || ':' || (SELECT MAX(rowid) FROM Products)
+    """
+
+def source_signature(conn):
+    """Fingerprint the source tables and the roll-up query that reads them."""
+    counts = conn.execute(SOURCE_SIGNATURE_QUERY).fetchone()[0]
+    return f"{counts}:{zlib.crc32(CATEGORY_TIER_QUERY.encode()):08x}"
+
+def rollup_is_fresh(conn, signature):
+    """Check whether the roll-up table was built from the current source data."""
+    try:
+        row = conn.execute(f"SELECT source_signature FROM {ROLLUP_META_TABLE} WHERE table_name = ?",
+                           (ROLLUP_TABLE,)).fetchone()
+    except sqlite3.OperationalError:
+        # Meta table not created yet
+        return False
+    return row is not None and row[0] == signature
+
+def index_has_stats(conn, index_name):
+    """Check whether ANALYZE has recorded planner statistics for an index."""
+    try:
+        row = conn.execute("SELECT 1 FROM sqlite_stat1 WHERE idx = ?", (index_name,)).fetchone()
+    except sqlite3.OperationalError:
+        # sqlite_stat1 not created yet
+        return False
+    return row is not None
+
+def refresh_rollup(conn, signature=None):
+    """Rebuild the category/tier roll-up table and record its source signature."""
+    if signature is None:
+        signature = source_signature(conn)
+    
+    with conn:
+        conn.execute("BEGIN")
+        for index_name, index_sql in ROLLUP_SOURCE_INDEXES.items():
+            conn.execute(index_sql)
+            # The ingester analyzes only its own indexes; without statistics
+            # for this one the planner keeps choosing the narrower index
+            if not index_has_stats(conn, index_name):
+                conn.execute(f"ANALYZE {index_name}")
+        
+        conn.execute(f"DROP TABLE IF EXISTS {ROLLUP_TABLE}")
+        conn.execute(f"CREATE TABLE {ROLLUP_TABLE} AS {CATEGORY_TIER_QUERY}")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {ROLLUP_META_TABLE} "
+                     "(table_name TEXT PRIMARY KEY, source_signature TEXT NOT NULL)")
+        conn.execute(f"INSERT OR REPLACE INTO {ROLLUP_META_TABLE} VALUES (?, ?)",
+                     (ROLLUP_TABLE, signature))
+
+def load_data(db_path="ecommerce.db"):
+    """Load customer spending by product category, one row per category."""
+    conn = get_conn(db_path)
+    
+    source = ROLLUP_TABLE
+    signature = source_signature(conn)
+    if not rollup_is_fresh(conn, signature):
+        try:
+            refresh_rollup(conn, signature)
+        except sqlite3.OperationalError as e:
+            # Read-only database: aggregate directly without materializing
+            print(f"Note: Could not refresh {ROLLUP_TABLE}: {e}")
+            source = f"({CATEGORY_TIER_QUERY})"
+    
+    cursor = conn.execute(CATEGORY_PIVOT_QUERY.format(source=source))
+    return fetch_typed_frame(cursor, CATEGORY_PIVOT_DTYPES)
+
+def summarize_categories(df):
+    """Index the per-category frame by category and add the derived columns the charts share."""
+    category_df = df.set_index('category')
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    orders = category_df['total_orders']
+    category_df['avg_order_value'] = (category_df['total_revenue'] / orders.where(orders > 0)).fillna(0)
+    return category_df
+
+def compute_summary_stats(category_df, premium_luxury):
+    """Compute the headline figures shared by the summary box, metric cards and recommendations."""
+    category_totals = category_df['total_revenue']
+    total_revenue = category_totals.to_numpy().sum()
+    total_orders = category_df['total_orders'].to_numpy().sum()
+    premium_luxury_revenue = premium_luxury.sum()
+    
+    return {
+        'total_revenue': total_revenue,
+        'avg_order_value': total_revenue / total_orders if total_orders > 0 else 0,
+        'premium_luxury_pct': (premium_luxury_revenue / total_revenue * 100) if total_revenue > 0 else 0,
+        'top_category': category_totals.index[0]
+    }
+
+def add_drop_shadow(patch, alpha):
+    """Give a card patch the dashboard's soft drop shadow."""
+    # Drop shadow drawn in the same pass as the box itself
+    patch.set_path_effects([patheffects.withSimplePatchShadow(
+        offset=(3, -3), shadow_rgbFace='black', alpha=alpha)])
 
 def create_metric_card(ax, value, label, color):
     """Create a styled metric card with perfect alignment."""
     ax.axis('off')
     
-    # Add shadow effect
-    shadow = FancyBboxPatch((0.015, -0.015), 1, 1,
-                           boxstyle="round,pad=0.02",
-                           facecolor='black',
-                           alpha=0.12,
-                           transform=ax.transAxes,
-                           zorder=0)
-    ax.add_patch(shadow)
-    
     # Create rounded rectangle background - perfectly centered
     fancy_box = FancyBboxPatch((0, 0), 1, 1,
                               boxstyle="round,pad=0.025",
@@ -95,6 +252,7 @@ def create_metric_card(ax, value, label, color):
                               linewidth=2.5,
                               transform=ax.transAxes,
                               zorder=1)
+    add_drop_shadow(fancy_box, alpha=0.12)
     ax.add_patch(fancy_box)
     
     # Add text - perfectly centered
@@ -105,26 +263,10 @@ def create_metric_card(ax, value, label, color):
            fontsize=12, color='white', weight='normal',
            transform=ax.transAxes, zorder=2)
 
-def create_executive_summary_box(ax, df, premium_luxury, category_totals):
+def create_executive_summary_box(ax, stats):
     """Create a clean executive summary box with perfect alignment."""
     ax.axis('off')
     
-    total_revenue = df['total_revenue'].sum()
-    premium_luxury_revenue = premium_luxury['total_revenue'].sum() if len(premium_luxury) > 0 else 0
-    premium_luxury_pct = (premium_luxury_revenue / total_revenue * 100) if total_revenue > 0 else 0
-    top_category = category_totals.index[0]
-    top_category_revenue = category_totals.iloc[0]
-    avg_order_value = df['total_revenue'].sum() / df['total_orders'].sum() if df['total_orders'].sum() > 0 else 0
-    
-    # Create semi-transparent background with shadow
-    shadow = FancyBboxPatch((0.01, -0.01), 1, 1,
-                           boxstyle="round,pad=0.03",
-                           facecolor='black',
-                           alpha=0.05,
-                           transform=ax.transAxes,
-                           zorder=0)
-    ax.add_patch(shadow)
-    
     fancy_box = FancyBboxPatch((0, 0), 1, 1,
                               boxstyle="round,pad=0.04",
                               facecolor='white',
@@ -133,6 +275,7 @@ def create_executive_summary_box(ax, df, premium_luxury, category_totals):
                               alpha=0.95,
                               transform=ax.transAxes,
                               zorder=1)
+    add_drop_shadow(fancy_box, alpha=0.05)
     ax.add_patch(fancy_box)
     
     # Title - centered and aligned
@@ -147,10 +290,10 @@ def create_executive_summary_box(ax, df, premium_luxury, category_totals):
     # Key metrics - left-aligned with consistent spacing
     y_pos = 0.70
     metrics = [
-        f"Total Revenue: ${total_revenue:,.0f}",
-        f"Premium/Luxury: {premium_luxury_pct:.1f}% of revenue",
-        f"Top Category: {top_category}",
-        f"Avg Order Value: ${avg_order_value:,.0f}"
+        f"Total Revenue: ${stats['total_revenue']:,.0f}",
+        f"Premium/Luxury: {stats['premium_luxury_pct']:.1f}% of revenue",
+        f"Top Category: {stats['top_category']}",
+        f"Avg Order Value: ${stats['avg_order_value']:,.0f}"
     ]
     
     for metric in metrics:
@@ -159,26 +302,16 @@ def create_executive_summary_box(ax, df, premium_luxury, category_totals):
                transform=ax.transAxes, zorder=2)
         y_pos -= 0.14
 
-def create_category_revenue_chart(ax, df, category_totals):
+def create_category_revenue_chart(ax, category_df):
     """Create main revenue chart with modern styling."""
-    categories = category_totals.index
+    categories = category_df.index
     x_pos = np.arange(len(categories))
     width = 0.65
     
-    # Prepare stacked data
-    premium_data = []
-    luxury_data = []
-    standard_data = []
-    
-    for cat in categories:
-        cat_df = df[df['category'] == cat]
-        premium_data.append(cat_df[cat_df['price_tier'] == 'Premium']['total_revenue'].sum())
-        luxury_data.append(cat_df[cat_df['price_tier'] == 'Luxury']['total_revenue'].sum())
-        standard_data.append(cat_df[cat_df['price_tier'] == 'Standard']['total_revenue'].sum())
-    
-    premium_data = np.array(premium_data)
-    luxury_data = np.array(luxury_data)
-    standard_data = np.array(standard_data)
+    # Stacked data comes straight from the SQL pivot
+    premium_data = category_df['premium_rev'].to_numpy()
+    luxury_data = category_df['luxury_rev'].to_numpy()
+    standard_data = category_df['standard_rev'].to_numpy()
     
     # Create stacked bars with increased thickness
     bars1 = ax.bar(x_pos, standard_data, width, label='Standard', 
@@ -198,33 +331,20 @@ def create_category_revenue_chart(ax, df, category_totals):
     ax.set_xticklabels(categories, fontsize=11, color=COLORS['text'])
     ax.legend(loc='upper right', frameon=True, fancybox=True, shadow=True,
              fontsize=10, framealpha=0.9)
-    ax.grid(axis='y', alpha=0.2, linestyle='--', linewidth=0.8)
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color(COLORS['border'])
-    ax.spines['bottom'].set_color(COLORS['border'])
     
-    # Add value labels only on highest bars
+    # Add value labels only on highest bars (the top segment ends at the category total)
     total_heights = standard_data + luxury_data + premium_data
     max_height = total_heights.max()
     threshold = max_height * 0.15  # Only label bars above 15% of max
     
-    for i, (bar, height) in enumerate(zip(bars3, total_heights)):
-        if height > threshold:
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'${height:,.0f}',
-                   ha='center', va='bottom', fontsize=10, fontweight='bold',
-                   color=COLORS['text'])
+    labels = [format_dollars(height) if height > threshold else '' for height in total_heights.tolist()]
+    ax.bar_label(bars3, labels=labels, fontsize=10, fontweight='bold', color=COLORS['text'])
 
-def create_tier_comparison_chart(ax, df):
+def create_tier_comparison_chart(ax, tier_totals):
     """Create modern donut chart."""
-    tier_totals = df.groupby('price_tier')['total_revenue'].sum()
-    
     labels = ['Standard', 'Luxury', 'Premium']
     colors_list = [COLORS['standard'], COLORS['luxury'], COLORS['premium']]
-    sizes = [tier_totals.get('Standard', 0), 
-             tier_totals.get('Luxury', 0), 
-             tier_totals.get('Premium', 0)]
+    sizes = tier_totals[labels].tolist()
     
     # Create donut chart
     wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_list,
@@ -252,9 +372,9 @@ def create_tier_comparison_chart(ax, df):
         autotext.set_fontweight('bold')
         autotext.set_fontsize(12)
 
-def create_customer_distribution_chart(ax, df):
+def create_customer_distribution_chart(ax, category_df):
     """Create horizontal bar chart with modern styling."""
-    customer_by_category = df.groupby('category')['unique_customers'].sum().sort_values(ascending=True)
+    customer_by_category = category_df['unique_customers'].sort_values(ascending=True)
     
     # Map categories to colors
     category_colors = {
@@ -274,22 +394,18 @@ def create_customer_distribution_chart(ax, df):
     ax.set_xlabel('Unique Customers', fontsize=12, fontweight='bold', color=COLORS['text'], labelpad=12)
     ax.set_title('Customer Reach by Category', fontsize=14, fontweight='bold',
                 color=COLORS['accent'], pad=20)
-    ax.grid(axis='x', alpha=0.2, linestyle='--', linewidth=0.8)
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color(COLORS['border'])
-    ax.spines['bottom'].set_color(COLORS['border'])
+    # Horizontal bars: grid the value axis instead of the default y grid
+    ax.xaxis.grid(True)
+    ax.yaxis.grid(False)
     
     # Add value labels
     for bar, val in zip(bars, customer_by_category.values):
         ax.text(val + 1, bar.get_y() + bar.get_height()/2, f'{int(val)}',
                ha='left', va='center', fontsize=11, fontweight='bold', color=COLORS['text'])
 
-def create_avg_order_value_chart(ax, df):
+def create_avg_order_value_chart(ax, category_df):
     """Create average order value chart."""
-    category_avg = df.groupby('category').apply(
-        lambda x: x['total_revenue'].sum() / x['total_orders'].sum() if x['total_orders'].sum() > 0 else 0
-    ).sort_values(ascending=False)
+    category_avg = category_df['avg_order_value'].sort_values(ascending=False)
     
     # Map categories to colors
     category_colors = {
@@ -308,37 +424,19 @@ def create_avg_order_value_chart(ax, df):
     ax.set_ylabel('Average Order Value ($)', fontsize=12, fontweight='bold', color=COLORS['text'], labelpad=12)
     ax.set_title('Average Order Value by Category', fontsize=14, fontweight='bold',
                 color=COLORS['accent'], pad=20)
-    ax.grid(axis='y', alpha=0.2, linestyle='--', linewidth=0.8)
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['left'].set_color(COLORS['border'])
-    ax.spines['bottom'].set_color(COLORS['border'])
     
     # Add value labels on highest bars
     max_val = category_avg.max()
     threshold = max_val * 0.2
     
-    for bar, val in zip(bars, category_avg.values):
-        if val > threshold:
-            ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(),
-                   f'${val:,.0f}',
-                   ha='center', va='bottom', fontsize=10, fontweight='bold', color=COLORS['text'])
+    labels = [format_dollars(val) if val > threshold else '' for val in category_avg.tolist()]
+    ax.bar_label(bars, labels=labels, fontsize=10, fontweight='bold', color=COLORS['text'])
 
-def create_recommendations_section(ax, df, premium_luxury, category_totals):
+def create_recommendations_section(ax, stats):
     """Create recommendations section with perfect alignment."""
     ax.axis('off')
     
-    total_revenue = df['total_revenue'].sum()
-    top_category = category_totals.index[0]
-    
-    # Shadow effect
-    shadow = FancyBboxPatch((0.01, -0.01), 1, 1,
-                           boxstyle="round,pad=0.03",
-                           facecolor='black',
-                           alpha=0.05,
-                           transform=ax.transAxes,
-                           zorder=0)
-    ax.add_patch(shadow)
+    top_category = stats['top_category']
     
     # Background box - centered
     fancy_box = FancyBboxPatch((0, 0), 1, 1,
@@ -349,6 +447,7 @@ def create_recommendations_section(ax, df, premium_luxury, category_totals):
                               alpha=0.9,
                               transform=ax.transAxes,
                               zorder=1)
+    add_drop_shadow(fancy_box, alpha=0.05)
     ax.add_patch(fancy_box)
     
     # Title - centered
@@ -383,10 +482,14 @@ def create_recommendations_section(ax, df, premium_luxury, category_totals):
 def create_visualizations(df):
     """Create comprehensive executive-ready dashboard with perfect alignment."""
     
-    # Prepare data
-    category_totals = df.groupby('category')['total_revenue'].sum().sort_values(ascending=False)
-    premium_luxury = df[df['price_tier'].isin(['Premium', 'Luxury'])]
-    standard = df[df['price_tier'] == 'Standard']
+    # Prepare data once for every chart (rows arrive pre-sorted by total revenue)
+    category_df = summarize_categories(df)
+    # Revenue per tier, indexed by tier label
+    tier_totals = df[list(TIER_REVENUE_COLUMNS.values())].sum().set_axis(list(TIER_REVENUE_COLUMNS))
+    premium_luxury = tier_totals[['Luxury', 'Premium']]
+    premium_luxury = premium_luxury[premium_luxury > 0]
+    # Grand totals are reduced once here and shared by every panel
+    stats = compute_summary_stats(category_df, premium_luxury)
     
     # Create figure with optimized spacing and alignment
     fig = plt.figure(figsize=(20, 14), facecolor=COLORS['background'])
@@ -409,97 +512,95 @@ def create_visualizations(df):
     
     # Row 0: Executive Summary + 3 Metric Cards (perfectly aligned)
     ax_summary = fig.add_subplot(gs[0, 0])
-    create_executive_summary_box(ax_summary, df, premium_luxury, category_totals)
-    
-    total_revenue = df['total_revenue'].sum()
-    avg_order_value = df['total_revenue'].sum() / df['total_orders'].sum() if df['total_orders'].sum() > 0 else 0
-    top_category = category_totals.index[0]
+    create_executive_summary_box(ax_summary, stats)
     
     # Metric cards - aligned in a row
     ax_metric1 = fig.add_subplot(gs[0, 1])
-    create_metric_card(ax_metric1, f'${total_revenue:,.0f}', 'Total Revenue', COLORS['accent'])
+    create_metric_card(ax_metric1, f"${stats['total_revenue']:,.0f}", 'Total Revenue', COLORS['accent'])
     
     ax_metric2 = fig.add_subplot(gs[0, 2])
-    create_metric_card(ax_metric2, f'${avg_order_value:,.0f}', 'Avg Order Value', COLORS['premium'])
+    create_metric_card(ax_metric2, f"${stats['avg_order_value']:,.0f}", 'Avg Order Value', COLORS['premium'])
     
     ax_metric3 = fig.add_subplot(gs[0, 3])
-    create_metric_card(ax_metric3, top_category, 'Top Category', COLORS['luxury'])
+    create_metric_card(ax_metric3, stats['top_category'], 'Top Category', COLORS['luxury'])
     
     # Row 1: Main Revenue Chart (spans 2 columns) + Tier Comparison + Premium Breakdown
     ax_revenue = fig.add_subplot(gs[1, :2])
-    create_category_revenue_chart(ax_revenue, df, category_totals)
+    create_category_revenue_chart(ax_revenue, category_df)
     
     # Tier Comparison - aligned to the right
     ax_tier = fig.add_subplot(gs[1, 2])
-    create_tier_comparison_chart(ax_tier, df)
+    create_tier_comparison_chart(ax_tier, tier_totals)
     
     # Premium/Luxury Breakdown - aligned below tier chart
     ax_premium = fig.add_subplot(gs[1, 3])
     if len(premium_luxury) > 0:
-        tier_revenue = premium_luxury.groupby('price_tier')['total_revenue'].sum()
-        colors_list = [COLORS[tier.lower()] if tier.lower() in COLORS else COLORS['luxury'] 
-                      for tier in tier_revenue.index]
-        bars = ax_premium.bar(range(len(tier_revenue)), tier_revenue.values,
+        colors_list = [TIER_COLOR.get(tier, COLORS['luxury']) for tier in premium_luxury.index]
+        bars = ax_premium.bar(range(len(premium_luxury)), premium_luxury.values,
                              color=colors_list, alpha=0.85, edgecolor='white', linewidth=2, width=0.6)
-        ax_premium.set_xticks(range(len(tier_revenue)))
-        ax_premium.set_xticklabels(tier_revenue.index, fontsize=11, fontweight='bold', color=COLORS['text'])
+        ax_premium.set_xticks(range(len(premium_luxury)))
+        ax_premium.set_xticklabels(premium_luxury.index, fontsize=11, fontweight='bold', color=COLORS['text'])
         ax_premium.set_ylabel('Revenue ($)', fontsize=12, fontweight='bold', color=COLORS['text'], labelpad=12)
         ax_premium.set_title('Premium/Luxury Revenue', fontsize=14, fontweight='bold',
                             color=COLORS['accent'], pad=20)
-        ax_premium.grid(axis='y', alpha=0.2, linestyle='--', linewidth=0.8)
-        ax_premium.spines['top'].set_visible(False)
-        ax_premium.spines['right'].set_visible(False)
-        ax_premium.spines['left'].set_color(COLORS['border'])
-        ax_premium.spines['bottom'].set_color(COLORS['border'])
-        for bar, val in zip(bars, tier_revenue.values):
-            ax_premium.text(bar.get_x() + bar.get_width()/2., bar.get_height(),
-                           f'${val:,.0f}', ha='center', va='bottom',
-                           fontsize=11, fontweight='bold', color=COLORS['text'])
+        ax_premium.bar_label(bars, labels=list(map(format_dollars, premium_luxury.tolist())),
+                             fontsize=11, fontweight='bold', color=COLORS['text'])
     
     # Row 2: Customer Distribution + Average Order Value (aligned side by side)
     ax_customers = fig.add_subplot(gs[2, :2])
-    create_customer_distribution_chart(ax_customers, df)
+    create_customer_distribution_chart(ax_customers, category_df)
     
     ax_aov = fig.add_subplot(gs[2, 2:])
-    create_avg_order_value_chart(ax_aov, df)
+    create_avg_order_value_chart(ax_aov, category_df)
     
     # Row 3: Recommendations (centered, full width)
     ax_rec = fig.add_subplot(gs[3, :])
-    create_recommendations_section(ax_rec, df, premium_luxury, category_totals)
+    create_recommendations_section(ax_rec, stats)
     
     return fig
 
-def main():
+def main(dpi=DEFAULT_PNG_DPI):
     """Main execution function."""
     print("Loading data from database...")
     df = load_data()
     
-    print(f"Loaded {len(df)} category-tier combinations")
-    print(f"Categories: {df['category'].nunique()}")
+    print(f"Loaded {len(df)} product categories")
     print(f"Total Revenue: ${df['total_revenue'].sum():,.2f}")
     
     print("\nCreating executive-ready visualizations...")
     fig = create_visualizations(df)
     
-    # Save figure
-    output_file = "customer_spending_executive_dashboard.png"
-    fig.savefig(output_file, dpi=300, bbox_inches='tight', 
-                facecolor=COLORS['background'], edgecolor='none')
-    print(f"\n[OK] Executive dashboard saved to: {output_file}")
-    
-    # PDF version
-    output_pdf = "customer_spending_executive_dashboard.pdf"
-    fig.savefig(output_pdf, bbox_inches='tight', 
-                facecolor=COLORS['background'], edgecolor='none')
-    print(f"[OK] PDF version saved to: {output_pdf}")
-    
-    print("\nDisplaying chart...")
-    try:
-        plt.show()
-    except Exception as e:
-        print(f"Note: Could not display interactive chart: {e}")
-        print("Chart saved to files. Use an image viewer to open the PNG or PDF.")
+    # The recommendation icons are emoji that the default fonts lack; the
+    # missing-glyph warnings are expected and the rest of the text renders
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message=r'Glyph \d+ .* missing from font')
+        
+        # Measure the tight bounding box once and reuse it for both outputs
+        bbox = tight_bbox(fig)
+        
+        # Save figure
+        output_file = "customer_spending_executive_dashboard.png"
+        fig.savefig(output_file, dpi=dpi, bbox_inches=bbox, 
+                    facecolor=COLORS['background'], edgecolor='none')
+        print(f"\n[OK] Executive dashboard saved to: {output_file}")
+        
+        # PDF version
+        output_pdf = "customer_spending_executive_dashboard.pdf"
+        fig.savefig(output_pdf, bbox_inches=bbox, 
+                    facecolor=COLORS['background'], edgecolor='none')
+        print(f"[OK] PDF version saved to: {output_pdf}")
+        
+        print("\nDisplaying chart...")
+        try:
+            plt.show()
+        except Exception as e:
+            print(f"Note: Could not display interactive chart: {e}")
+            print("Chart saved to files. Use an image viewer to open the PNG or PDF.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Render the executive customer spending dashboard.")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_PNG_DPI,
+                        help=f"PNG resolution (default: {DEFAULT_PNG_DPI}; use 300 for print)")
+    args = parser.parse_args()
+    main(dpi=args.dpi)
 
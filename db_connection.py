@@ -0,0 +1,54 @@
+"""
+Shared SQLite connection and result loading for the reporting scripts.
+"""
+
+import atexit
+import sqlite3
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Applied once when a connection is opened: WAL lets readers run while the
+# roll-up refresh writes, and the page cache, temp store and memory map keep
+# the report joins off disk. Values are in SQLite's units (KiB when negative,
+# bytes for mmap_size)
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+]
+
+@lru_cache(maxsize=None)
+def get_conn(db_path="ecommerce.db"):
+    """Return the process-wide connection to db_path, opening and tuning it on first use."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        # Read-only database: keep its current journal mode
+        pass
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    
+    atexit.register(conn.close)
+    return conn
+
+def fetch_typed_frame(cursor, dtypes):
+    """
+    Build a DataFrame from an executed cursor with one typed column per result column.
+    
+    dtypes maps each column name to a NumPy dtype, or to 'category' for labels
+    that the charts reuse as keys and that are cheaper stored as codes.
+    """
+    column_names = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    
+    # Build typed column arrays straight from the fetched tuples instead of
+    # letting read_sql_query infer a type for every cell
+    columns = list(zip(*rows)) if rows else [()] * len(column_names)
+    return pd.DataFrame({
+        name: (pd.Categorical(values) if dtypes[name] == 'category'
+               else np.array(values, dtype=dtypes[name]))
+        for name, values in zip(column_names, columns)
+    })
@@ -0,0 +1,15 @@
+"""
+Shared figure helpers for the visualization scripts.
+"""
+
+import matplotlib.pyplot as plt
+
+def tight_bbox(fig):
+    """
+    Measure the figure's padded tight bounding box.
+    
+    Pass the result as bbox_inches to each savefig call of the same figure;
+    bbox_inches='tight' would walk every artist again on each save.
+    """
+    # Let matplotlib pick the renderer; only Agg canvases have get_renderer()
+    return fig.get_tightbbox().padded(plt.rcParams['savefig.pad_inches'])
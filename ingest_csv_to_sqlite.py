@@ -7,10 +7,43 @@ foreign key constraints, indexing, and comprehensive error handling.
 import sqlite3
 import pandas as pd
 import os
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from typing import Dict, List, Tuple, Optional
 import sys
 
+# Rows per savepoint-protected insert chunk
+INSERT_CHUNK_SIZE = 20000
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER caps the parameters one
+# multi-row INSERT statement can bind
+SQLITE_MAX_VARIABLES = 999
+
+# Errors caused by a row's own values; a chunk hitting one is retried row by
+# row to skip the bad rows. Any other error (disk full, locked) aborts the load
+ROW_REJECTED_ERRORS = (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.InterfaceError)
+
+# Freshness records of the dashboard roll-up tables (see
+# customer_spending_visualization_refactored.py). Dropped after every load so
+# the roll-ups are rebuilt even when only values, not ids, changed
+ROLLUP_META_TABLE = "rollup_meta"
+
+# Non-null values probed when deciding whether an object column is numeric
+OBJECT_SAMPLE_SIZE = 100
+
+# Rows read from a CSV at a time, so peak memory no longer scales with file size
+CSV_CHUNK_SIZE = 200000
+
+# Connection settings for the load: no fsync, journal kept in memory and the
+# file locked for the whole run. Safe because a failed load is simply re-run
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "locking_mode": "EXCLUSIVE",
+    "cache_size": "-200000",
+}
+
 
 class CSVToSQLiteIngester:
     """Handles ingestion of CSV files into SQLite database."""
@@ -26,18 +59,103 @@ class CSVToSQLiteIngester:
         self.conn = None
         self.cursor = None
         self.ingestion_stats = {}
+        self.saved_pragmas = {}
         
     def connect(self):
         """Establish connection to SQLite database."""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            # Autocommit mode: ingest_csv opens and commits its own transactions
+            self.conn = sqlite3.connect(self.db_path, isolation_level=None)
             self.conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+            # Larger pages for a new database (no effect once tables exist) and
+            # memory-mapped reads for the summary queries
+            self.conn.execute("PRAGMA page_size = 8192")
+            self.conn.execute("PRAGMA mmap_size = 268435456")
             self.cursor = self.conn.cursor()
             print(f"[OK] Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             print(f"[ERROR] Error connecting to database: {e}")
             raise
     
+    def enable_bulk_pragmas(self):
+        """
+        Switch the connection to bulk-load settings and defer foreign key checks.
+        
+        Tables are loaded parents first, so foreign keys stay off during the
+        inserts and are verified once by check_foreign_keys().
+        """
+        for pragma, value in BULK_LOAD_PRAGMAS.items():
+            self.saved_pragmas[pragma] = self.conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        print(f"[OK] Bulk-load PRAGMAs enabled")
+    
+    def restore_pragmas(self):
+        """
+        Restore the connection settings saved by enable_bulk_pragmas().
+        
+        The journal is switched to WAL rather than back to its old mode, so
+        the report scripts can read while the database is being reloaded.
+        """
+        self.saved_pragmas["journal_mode"] = "WAL"
+        # Reverse order: locking_mode must be NORMAL before WAL is entered, or
+        # SQLite keeps the connection in EXCLUSIVE mode for as long as it is open
+        for pragma, value in reversed(self.saved_pragmas.items()):
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        self.saved_pragmas = {}
+        self.conn.execute("PRAGMA foreign_keys = ON")
+    
+    def remove_fk_violations(self, table_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Delete rows whose foreign keys have no matching parent row.
+        
+        Runs inside the caller's transaction with foreign keys off, so the
+        deletes never cascade. Removing a row can orphan rows that reference
+        it, so the check is repeated until it comes back clean.
+        
+        Args:
+            table_name: Only check (and delete from) this table; all tables if None
+            
+        Returns:
+            Number of rows removed per table
+        """
+        check_sql = f"PRAGMA foreign_key_check({table_name})" if table_name else "PRAGMA foreign_key_check"
+        rows_removed = {}
+        while True:
+            violations = {(table, rowid, parent) for table, rowid, parent, _
+                          in self.conn.execute(check_sql)}
+            if not violations:
+                break
+            for table, rowid, parent in sorted(violations):
+                print(f"  [WARNING] Removing row {rowid} from '{table}': "
+                      f"no matching row in '{parent}'")
+                self.cursor.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+                rows_removed[table] = rows_removed.get(table, 0) + self.cursor.rowcount
+        return rows_removed
+    
+    def check_foreign_keys(self) -> int:
+        """
+        Validate foreign keys across all tables after a bulk load.
+        
+        Returns:
+            Number of rows removed
+        """
+        self.conn.execute("BEGIN")
+        removed_per_table = self.remove_fk_violations()
+        self.conn.commit()
+        
+        for table, removed in removed_per_table.items():
+            if table in self.ingestion_stats:
+                self.ingestion_stats[table] -= removed
+        rows_removed = sum(removed_per_table.values())
+        
+        print(f"[OK] Foreign key check passed ({rows_removed} rows removed)")
+        return rows_removed
+    
+    def invalidate_rollups(self):
+        """Drop the roll-up freshness records so dashboards rebuild from the new data."""
+        self.cursor.execute(f"DROP TABLE IF EXISTS {ROLLUP_META_TABLE};")
+    
     def close(self):
         """Close database connection."""
         if self.conn:
@@ -68,30 +186,19 @@ class CSVToSQLiteIngester:
             return "INTEGER"  # SQLite uses INTEGER for boolean (0/1)
         # Handle string/object types
         elif pd.api.types.is_object_dtype(dtype):
-            # Check if it's actually numeric stored as string
-            try:
-                pd.to_numeric(sample_values.dropna().iloc[0] if len(sample_values.dropna()) > 0 else "0")
+            # Check if it's actually numeric stored as string, probing a sample
+            # rather than a single value (date strings are TEXT like any other)
+            sample = sample_values.dropna().head(OBJECT_SAMPLE_SIZE)
+            if pd.to_numeric(sample, errors='coerce').notna().all():
                 return "REAL"
-            except (ValueError, TypeError, IndexError):
-                # Check if it's a date string
-                if len(sample_values.dropna()) > 0:
-                    sample = str(sample_values.dropna().iloc[0])
-                    try:
-                        datetime.strptime(sample, "%Y-%m-%d")
-                        return "TEXT"
-                    except ValueError:
-                        try:
-                            datetime.strptime(sample, "%Y-%m-%d %H:%M:%S")
-                            return "TEXT"
-                        except (ValueError, TypeError):
-                            pass
-                return "TEXT"
+            return "TEXT"
         else:
             return "TEXT"  # Default to TEXT
     
     def create_table_schema(self, df: pd.DataFrame, table_name: str, 
                            primary_key: Optional[str] = None,
-                           foreign_keys: Optional[List[Tuple[str, str, str]]] = None) -> str:
+                           foreign_keys: Optional[List[Tuple[str, str, str]]] = None,
+                           generated_columns: Optional[List[Tuple[str, str, str]]] = None) -> str:
         """
         Generate CREATE TABLE SQL statement with automatic type detection.
         
@@ -100,6 +207,8 @@ class CSVToSQLiteIngester:
             table_name: Name of the table
             primary_key: Column name for primary key
             foreign_keys: List of (column, ref_table, ref_column) tuples
+            generated_columns: List of (column, sqlite_type, expression) tuples
+                for stored generated columns computed by SQLite on insert
             
         Returns:
             SQL CREATE TABLE statement
@@ -116,6 +225,11 @@ class CSVToSQLiteIngester:
             
             columns.append(col_def)
         
+        # Add stored generated columns (computed once on insert, not per query)
+        if generated_columns:
+            for gen_col, gen_type, expression in generated_columns:
+                columns.append(f'"{gen_col}" {gen_type} GENERATED ALWAYS AS ({expression}) STORED')
+        
         create_sql = f"CREATE TABLE IF NOT EXISTS {table_name} (\n"
         create_sql += ",\n".join(f"    {col}" for col in columns)
         
@@ -128,6 +242,47 @@ class CSVToSQLiteIngester:
         
         return create_sql
     
+    def table_is_current(self, table_name: str, create_sql: str) -> bool:
+        """
+        Check whether a table already exists with exactly the given schema.
+        
+        Args:
+            table_name: Name of the table
+            create_sql: CREATE TABLE statement from create_table_schema()
+            
+        Returns:
+            True if the stored schema matches create_sql
+        """
+        self.cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        )
+        existing = self.cursor.fetchone()
+        # sqlite_master keeps the statement without IF NOT EXISTS or the semicolon
+        expected = create_sql.replace("CREATE TABLE IF NOT EXISTS", "CREATE TABLE", 1).rstrip(";")
+        return existing is not None and existing[0] == expected
+    
+    def drop_indexes(self, table_name: str) -> List[str]:
+        """
+        Drop a table's secondary indexes so a reload does not maintain them per row.
+        
+        Indexes that SQLite creates for PRIMARY KEY and UNIQUE constraints have
+        no SQL and are kept.
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            CREATE INDEX statements of the dropped indexes, to rebuild them
+        """
+        self.cursor.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table_name,)
+        )
+        indexes = self.cursor.fetchall()
+        for index_name, _ in indexes:
+            self.cursor.execute(f'DROP INDEX "{index_name}";')
+        return [index_sql for _, index_sql in indexes]
+    
     def create_indexes(self, table_name: str, indexes: List[str]):
         """
         Create indexes on specified columns.
@@ -145,10 +300,94 @@ class CSVToSQLiteIngester:
             except sqlite3.Error as e:
                 print(f"  ⚠ Warning: Could not create index {index_name}: {e}")
     
+    def insert_chunk(self, insert_sql: str, batch_sql: str, batch_size: int,
+                     rows: List[tuple], first_row: int, columns: List[str]) -> int:
+        """
+        Insert a chunk of rows using multi-row INSERT statements.
+        
+        The chunk runs under a savepoint. If a row is rejected (constraint or
+        binding error), the chunk is rolled back and retried row by row so that
+        only the failing rows are skipped. Other errors abort the load.
+        
+        Args:
+            insert_sql: Parameterized single-row INSERT statement
+            batch_sql: INSERT statement with batch_size VALUES groups
+            batch_size: Number of rows bound by each batch_sql execution
+            rows: Row tuples to insert
+            first_row: Position of the chunk's first row in the CSV (0-based)
+            columns: Column names, used to report failing rows
+            
+        Returns:
+            Number of rows inserted
+        """
+        # Full batches go through batch_sql; the tail goes through executemany
+        full_batches = len(rows) - len(rows) % batch_size
+        
+        self.cursor.execute("SAVEPOINT insert_chunk")
+        try:
+            for start in range(0, full_batches, batch_size):
+                self.cursor.execute(batch_sql, tuple(chain.from_iterable(rows[start:start + batch_size])))
+            self.cursor.executemany(insert_sql, rows[full_batches:])
+            self.cursor.execute("RELEASE insert_chunk")
+            return len(rows)
+        except ROW_REJECTED_ERRORS:
+            self.cursor.execute("ROLLBACK TO insert_chunk")
+        
+        rows_inserted = 0
+        for offset, row in enumerate(rows):
+            try:
+                self.cursor.execute(insert_sql, row)
+                rows_inserted += 1
+            except ROW_REJECTED_ERRORS as e:
+                print(f"  [WARNING] Error inserting row {first_row + offset + 1}: {e}")
+                print(f"    Row data: {dict(zip(columns, row))}")
+                # Continue processing other rows
+        self.cursor.execute("RELEASE insert_chunk")
+        return rows_inserted
+    
+    def insert_dataframe(self, df: pd.DataFrame, table_name: str, first_row: int = 0) -> int:
+        """
+        Bulk-insert a DataFrame into an existing table.
+        
+        Args:
+            df: DataFrame whose columns match the table
+            table_name: Name of the target table
+            first_row: Position of the frame's first row in the CSV (0-based)
+            
+        Returns:
+            Number of rows inserted
+        """
+        # Convert datetime columns to strings for SQLite; strftime leaves NaT
+        # missing (stored as NULL) where astype(str) wrote the text 'NaT'
+        for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
+            df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        placeholders = "(" + ",".join(["?"] * len(df.columns)) + ")"
+        column_names = ",".join([f'"{col}"' for col in df.columns])
+        insert_sql = f'INSERT INTO {table_name} ({column_names}) VALUES {placeholders}'
+        
+        # Bind as many rows per statement as the variable limit allows
+        batch_size = max(1, SQLITE_MAX_VARIABLES // len(df.columns))
+        batch_sql = insert_sql + ("," + placeholders) * (batch_size - 1)
+        
+        # Convert column by column (NaN mapped to None for proper NULL handling)
+        # and zip into row tuples, instead of interleaving a 2-D object array
+        values = [df[col].to_numpy(dtype=object, na_value=None) for col in df.columns]
+        rows = list(zip(*values))
+        
+        rows_inserted = 0
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            rows_inserted += self.insert_chunk(insert_sql, batch_sql, batch_size,
+                                               rows[start:start + INSERT_CHUNK_SIZE],
+                                               first_row + start, list(df.columns))
+        return rows_inserted
+    
     def ingest_csv(self, csv_path: str, table_name: str,
                    primary_key: Optional[str] = None,
                    foreign_keys: Optional[List[Tuple[str, str, str]]] = None,
-                   indexes: Optional[List[str]] = None) -> int:
+                   indexes: Optional[List[str]] = None,
+                   generated_columns: Optional[List[Tuple[str, str, str]]] = None,
+                   dtypes: Optional[Dict[str, str]] = None) -> int:
         """
         Ingest a CSV file into SQLite table.
         
@@ -158,6 +397,9 @@ class CSVToSQLiteIngester:
             primary_key: Column name for primary key
             foreign_keys: List of (column, ref_table, ref_column) tuples
             indexes: List of column names to create indexes on
+            generated_columns: List of (column, sqlite_type, expression) tuples
+            dtypes: Mapping of CSV column to pandas dtype, passed to read_csv so
+                columns are not type-inferred
             
         Returns:
             Number of rows inserted
@@ -168,64 +410,73 @@ class CSVToSQLiteIngester:
         print(f"\n[PROCESSING] {csv_path}...")
         
         try:
-            # Read CSV with error handling
-            df = pd.read_csv(csv_path, encoding='utf-8')
-            print(f"  [OK] Read {len(df)} rows from CSV")
+            # Stream the CSV in chunks; the schema is detected from the first one
+            reader = pd.read_csv(csv_path, encoding='utf-8', dtype=dtypes,
+                                 chunksize=CSV_CHUNK_SIZE)
+            df = next(reader)
             
             # Clean column names (remove any whitespace)
-            df.columns = df.columns.str.strip()
+            columns = df.columns.str.strip()
+            df.columns = columns
             
             # Create table schema
-            create_sql = self.create_table_schema(df, table_name, primary_key, foreign_keys)
+            create_sql = self.create_table_schema(df, table_name, primary_key, foreign_keys,
+                                                  generated_columns)
             
-            # Drop existing table if it exists (for re-running)
-            # Temporarily disable foreign keys to allow dropping referenced tables
+            # Clear, reload and re-index the table in a single transaction. SQLite
+            # DDL is transactional, so any failure, including a parse error in a
+            # later chunk, rolls back to the previous table and its rows.
+            # Foreign keys stay off for the whole load so referenced tables can
+            # be cleared (the pragma cannot change inside a transaction)
             self.conn.execute("PRAGMA foreign_keys = OFF")
-            self.cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
-            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.execute("BEGIN")
             
-            # Create table
-            self.cursor.execute(create_sql)
-            print(f"  [OK] Created table '{table_name}'")
+            # On re-runs with an unchanged schema, empty the table in place
+            # (SQLite's truncate optimization); otherwise drop and recreate it.
+            # Either way the table has no secondary indexes during the inserts
+            saved_indexes = []
+            if self.table_is_current(table_name, create_sql):
+                saved_indexes = self.drop_indexes(table_name)
+                self.cursor.execute(f"DELETE FROM {table_name};")
+                print(f"  [OK] Cleared table '{table_name}'")
+            else:
+                self.cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
+                self.cursor.execute(create_sql)
+                print(f"  [OK] Created table '{table_name}'")
             
-            # Create indexes
+            rows_read = rows_inserted = 0
+            # SQLite allows one writer, so inserts stay on this thread while the
+            # next chunk is parsed on a worker thread
+            with reader, ThreadPoolExecutor(max_workers=1) as parser:
+                while df is not None:
+                    next_chunk = parser.submit(next, reader, None)
+                    df.columns = columns
+                    rows_inserted += self.insert_dataframe(df, table_name, rows_read)
+                    rows_read += len(df)
+                    df = next_chunk.result()
+            print(f"  [OK] Read {rows_read} rows from CSV")
+            print(f"  [OK] Inserted {rows_inserted} rows into '{table_name}'")
+            
+            # Outside bulk-load mode nothing checks foreign keys later, so drop
+            # this table's orphaned rows now; other tables are left untouched
+            if not self.saved_pragmas:
+                rows_inserted -= self.remove_fk_violations(table_name).get(table_name, 0)
+            
+            # Create indexes once the data is in, so each B-tree is built in
+            # one pass instead of being updated on every insert. Indexes dropped
+            # for the reload (including ones added by other scripts) come back too
+            for index_sql in saved_indexes:
+                self.cursor.execute(index_sql)
             if indexes:
                 print(f"  [OK] Creating indexes on: {', '.join(indexes)}")
                 self.create_indexes(table_name, indexes)
+            if indexes or saved_indexes:
+                # Refresh planner statistics so the summary queries use the indexes
+                self.cursor.execute(f"ANALYZE {table_name};")
             
-            # Prepare data for insertion
-            # Convert datetime columns to strings for SQLite
-            for col in df.columns:
-                if pd.api.types.is_datetime64_any_dtype(df[col]):
-                    df[col] = df[col].astype(str)
-                elif df[col].dtype == 'object':
-                    # Replace NaN with None for proper NULL handling
-                    df[col] = df[col].where(pd.notnull(df[col]), None)
-            
-            # Insert data
-            placeholders = ",".join(["?"] * len(df.columns))
-            column_names = ",".join([f'"{col}"' for col in df.columns])
-            insert_sql = f'INSERT INTO {table_name} ({column_names}) VALUES ({placeholders})'
-            
-            rows_inserted = 0
-            for idx, row in df.iterrows():
-                try:
-                    # Convert row to tuple, handling NaN values
-                    row_values = []
-                    for val in row:
-                        if pd.isna(val):
-                            row_values.append(None)
-                        else:
-                            row_values.append(val)
-                    self.cursor.execute(insert_sql, tuple(row_values))
-                    rows_inserted += 1
-                except sqlite3.Error as e:
-                    print(f"  [WARNING] Error inserting row {idx + 1}: {e}")
-                    print(f"    Row data: {dict(zip(df.columns, row_values))}")
-                    # Continue processing other rows
-            
+            # Roll-ups built from the previous contents are now stale
+            self.invalidate_rollups()
             self.conn.commit()
-            print(f"  [OK] Inserted {rows_inserted} rows into '{table_name}'")
             
             self.ingestion_stats[table_name] = rows_inserted
             return rows_inserted
@@ -233,6 +484,8 @@ class CSVToSQLiteIngester:
         except pd.errors.EmptyDataError:
             raise ValueError(f"CSV file is empty: {csv_path}")
         except pd.errors.ParserError as e:
+            # A later chunk can fail after earlier ones were inserted
+            self.conn.rollback()
             raise ValueError(f"Error parsing CSV file {csv_path}: {e}")
         except sqlite3.Error as e:
             self.conn.rollback()
@@ -240,6 +493,9 @@ class CSVToSQLiteIngester:
         except Exception as e:
             self.conn.rollback()
             raise Exception(f"Unexpected error while ingesting {csv_path}: {e}")
+        finally:
+            if not self.saved_pragmas:
+                self.conn.execute("PRAGMA foreign_keys = ON")
     
     def generate_summary(self):
         """Generate and display ingestion summary with statistics."""
@@ -345,6 +601,7 @@ def main():
     try:
         # Connect to database
         ingester.connect()
+        ingester.enable_bulk_pragmas()
         
         # Define ingestion order (respecting foreign key dependencies)
         ingestion_config = [
@@ -353,21 +610,49 @@ def main():
                 "table": "Products",
                 "primary_key": "product_id",
                 "foreign_keys": None,
-                "indexes": ["category", "brand", "price"]
+                "indexes": ["category", "brand", "price", "price_tier_code"],
+                # 0 = Standard, 1 = Luxury ($200+), 2 = Premium ($500+)
+                "generated_columns": [
+                    ("price_tier_code", "INTEGER",
+                     "CASE WHEN price >= 500 THEN 2 WHEN price >= 200 THEN 1 ELSE 0 END")
+                ],
+                # Primary keys are int64; other integer columns use nullable
+                # Int64 so a blank cell loads as NULL instead of failing the read
+                "dtypes": {
+                    "product_id": "int64", "name": "string", "category": "string",
+                    "price": "float64", "description": "string", "stock_quantity": "Int64",
+                    "brand": "string", "sku": "string", "rating": "float64",
+                    "reviews_count": "Int64"
+                }
             },
             {
                 "csv": "Customers.csv",
                 "table": "Customers",
                 "primary_key": "customer_id",
                 "foreign_keys": None,
-                "indexes": ["city", "state", "country", "loyalty_points"]
+                "indexes": ["city", "state", "country", "loyalty_points"],
+                "dtypes": {
+                    "customer_id": "int64", "first_name": "string", "last_name": "string",
+                    "email": "string", "phone": "string", "address": "string",
+                    "city": "string", "state": "string", "country": "string",
+                    "postal_code": "Int64", "avatar_url": "string", "loyalty_points": "Int64",
+                    "registration_date": "string", "date_of_birth": "string"
+                }
             },
             {
                 "csv": "Orders.csv",
                 "table": "Orders",
                 "primary_key": "order_id",
                 "foreign_keys": [("customer_id", "Customers", "customer_id")],
-                "indexes": ["customer_id", "order_date", "status", "total_amount"]
+                "indexes": ["customer_id", "order_date", "status", "total_amount"],
+                "dtypes": {
+                    "order_id": "int64", "customer_id": "Int64", "order_date": "string",
+                    "status": "string", "shipping_address": "string",
+                    "shipping_city": "string", "shipping_state": "string",
+                    "shipping_country": "string", "shipping_postal_code": "Int64",
+                    "total_amount": "float64", "shipping_cost": "float64",
+                    "tax_amount": "float64", "discount_amount": "float64"
+                }
             },
             {
                 "csv": "Order_Items.csv",
@@ -377,14 +662,25 @@ def main():
                     ("order_id", "Orders", "order_id"),
                     ("product_id", "Products", "product_id")
                 ],
-                "indexes": ["order_id", "product_id"]
+                "indexes": ["order_id", "product_id"],
+                "dtypes": {
+                    "order_item_id": "int64", "order_id": "Int64", "product_id": "Int64",
+                    "quantity": "Int64", "unit_price": "float64", "subtotal": "float64"
+                }
             },
             {
                 "csv": "Payments.csv",
                 "table": "Payments",
                 "primary_key": "payment_id",
                 "foreign_keys": [("order_id", "Orders", "order_id")],
-                "indexes": ["order_id", "payment_method", "status", "payment_date"]
+                "indexes": ["order_id", "payment_method", "status", "payment_date"],
+                # card_last_four is blank for non-card payments, so it stays float64
+                "dtypes": {
+                    "payment_id": "int64", "order_id": "Int64", "payment_method": "string",
+                    "amount": "float64", "payment_date": "string", "status": "string",
+                    "transaction_id": "string", "card_last_four": "float64",
+                    "card_brand": "string"
+                }
             }
         ]
         
@@ -395,9 +691,15 @@ def main():
                 table_name=config["table"],
                 primary_key=config["primary_key"],
                 foreign_keys=config["foreign_keys"],
-                indexes=config["indexes"]
+                indexes=config["indexes"],
+                generated_columns=config.get("generated_columns"),
+                dtypes=config.get("dtypes")
             )
         
+        # Validate the deferred foreign keys once, then leave bulk-load mode
+        ingester.check_foreign_keys()
+        ingester.restore_pragmas()
+        
         # Generate summary
         ingester.generate_summary()
         
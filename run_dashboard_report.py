@@ -2,8 +2,11 @@
 Run the customer dashboard report and display formatted results.
 """
 
+import re
 import sqlite3
+from functools import lru_cache
 import pandas as pd
+from db_connection import get_conn
 
 try:
     from tabulate import tabulate
@@ -12,6 +15,15 @@ except ImportError:
     HAS_TABULATE = False
     print("Note: 'tabulate' not installed. Install with 'pip install tabulate' for better formatting.")
 
+# Block comments and -- line comments, stripped in one pass
+COMMENT_RE = re.compile(r'/\*.*?\*/|--[^\n]*', re.DOTALL)
+
+@lru_cache(maxsize=None)
+def load_query(sql_file):
+    """Read sql_file and return its query with all comments stripped."""
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        return COMMENT_RE.sub('', f.read()).strip()
+
 def run_dashboard_report(db_path="ecommerce.db", sql_file="customer_dashboard_report.sql"):
     """
     Execute the dashboard report SQL query and display results.
@@ -22,44 +34,10 @@ def run_dashboard_report(db_path="ecommerce.db", sql_file="customer_dashboard_re
     """
     try:
         # Connect to database
-        conn = sqlite3.connect(db_path)
-        
-        # Read SQL query
-        with open(sql_file, 'r', encoding='utf-8') as f:
-            sql_content = f.read()
-        
-        # Extract the main query (before alternative queries section)
-        # Split by the alternative query marker
-        if '-- ============================================================================' in sql_content:
-            parts = sql_content.split('-- ============================================================================')
-            # Take the first part (main query) and the second part (which has the alternative)
-            # But we only want the main query, so find where the alternative starts
-            if '/*' in sql_content:
-                main_query = sql_content.split('/*')[0]
-            else:
-                main_query = parts[0] if len(parts) > 0 else sql_content
-        else:
-            main_query = sql_content.split('/*')[0] if '/*' in sql_content else sql_content
+        conn = get_conn(db_path)
         
-        # Remove comment lines (lines starting with --)
-        lines = []
-        for line in main_query.split('\n'):
-            stripped = line.strip()
-            # Keep the line if it's not a comment or is empty (we'll filter empty later)
-            if not stripped.startswith('--'):
-                lines.append(line)
-        
-        query = '\n'.join(lines).strip()
-        
-        # If query is empty, try a different approach - just remove comment markers
-        if not query or len(query) < 50:
-            # Fallback: remove only full-line comments
-            lines = []
-            for line in sql_content.split('\n'):
-                if line.strip() and not line.strip().startswith('--'):
-                    if '/*' not in line:  # Skip lines with block comment start
-                        lines.append(line)
-            query = '\n'.join(lines).split('/*')[0].strip()
+        # Read SQL query with comments (and the commented-out alternative) removed
+        query = load_query(sql_file)
         
         # Execute query
         print("=" * 100)
@@ -67,31 +45,19 @@ def run_dashboard_report(db_path="ecommerce.db", sql_file="customer_dashboard_re
         print("=" * 100)
         print("\nExecuting query...\n")
         
-        # Execute query using cursor first to check for errors
-        cursor = conn.cursor()
+        # Load the result straight into a DataFrame
         try:
-            cursor.execute(query)
-            # Get column names
-            if cursor.description:
-                columns = [desc[0] for desc in cursor.description]
-                results = cursor.fetchall()
-                # Convert to DataFrame
-                if len(results) > 0:
-                    df = pd.DataFrame(results, columns=columns)
-                else:
-                    print("Query returned 0 rows. Checking query logic...")
-                    # Test individual CTEs
-                    test_query = "WITH CustomerOrderSummary AS (SELECT customer_id, SUM(total_amount) AS total_spending, COUNT(order_id) AS order_count FROM Orders GROUP BY customer_id) SELECT COUNT(*) FROM CustomerOrderSummary"
-                    cursor.execute(test_query)
-                    print(f"CustomerOrderSummary CTE: {cursor.fetchone()[0]} rows")
-                    df = pd.DataFrame()  # Empty DataFrame
-            else:
-                print("Error: Query returned no description (possible syntax error)")
-                df = pd.DataFrame()
-        except sqlite3.Error as sql_err:
+            df = pd.read_sql_query(query, conn)
+        except pd.io.sql.DatabaseError as sql_err:
             print(f"SQL Error: {sql_err}")
             raise
         
+        if df.empty:
+            print("Query returned 0 rows. Checking query logic...")
+            # Test individual CTEs
+            test_query = "WITH CustomerOrderSummary AS (SELECT customer_id, SUM(total_amount) AS total_spending, COUNT(order_id) AS order_count FROM Orders GROUP BY customer_id) SELECT COUNT(*) FROM CustomerOrderSummary"
+            print(f"CustomerOrderSummary CTE: {conn.execute(test_query).fetchone()[0]} rows")
+        
         # Display results
         if len(df) > 0 and not df.empty:
             print(f"Found {len(df)} customers with orders\n")
@@ -140,11 +106,9 @@ def run_dashboard_report(db_path="ecommerce.db", sql_file="customer_dashboard_re
         else:
             print("No results found.")
         
-        conn.close()
-        
     except FileNotFoundError as e:
         print(f"Error: File not found - {e}")
-    except sqlite3.Error as e:
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
         print(f"Database error: {e}")
     except Exception as e:
         print(f"Error: {e}")